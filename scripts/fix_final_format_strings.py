@@ -3,89 +3,82 @@
 Fix the final remaining format string field access errors in Rust code.
 """
 
+import mmap
+import os
 import re
 import sys
 from pathlib import Path
 
+# Match format!/println!/write! calls whose format string contains a single
+# {self.field}, {var.field}, {self.method()} or {var.method()} placeholder.
+# write! additionally takes a leading writer argument.
+COMBINED = re.compile(
+    r'(?P<macro>format|println|write)!\s*\(\s*(?:(?P<writer>\w+)\s*,\s*)?'
+    r'"(?P<pre>[^"]*?)\{(?P<expr>(?:self|\w+)\.\w+(?:\(\))?)\}(?P<post>[^"]*?)"\s*\)'
+)
+
+def _replace(m):
+    """Move the field access out of the format string into an argument."""
+    macro, writer, pre, expr, post = m.group('macro', 'writer', 'pre', 'expr', 'post')
+    if writer:
+        return f'{macro}!({writer}, "{pre}{{}}{post}", {expr})'
+    return f'{macro}!("{pre}{{}}{post}", {expr})'
+
 def fix_format_string_field_access(content):
     """Fix format string field access patterns."""
-    
-    # More patterns to catch all cases
-    patterns = [
-        # Match format!("...{self.field}...")
-        (r'format!\s*\(\s*"([^"]*?)\{self\.(\w+)\}([^"]*?)"\s*\)', 
-         lambda m: f'format!("{m.group(1)}{{}}{m.group(3)}", self.{m.group(2)})'),
-        
-        # Match format!("...{var.field}...")
-        (r'format!\s*\(\s*"([^"]*?)\{(\w+)\.(\w+)\}([^"]*?)"\s*\)',
-         lambda m: f'format!("{m.group(1)}{{}}{m.group(4)}", {m.group(2)}.{m.group(3)})'),
-         
-        # Match format!("...{self.method()}...")
-        (r'format!\s*\(\s*"([^"]*?)\{self\.(\w+)\(\)\}([^"]*?)"\s*\)', 
-         lambda m: f'format!("{m.group(1)}{{}}{m.group(3)}", self.{m.group(2)}())'),
-         
-        # Match format!("...{var.method()}...")
-        (r'format!\s*\(\s*"([^"]*?)\{(\w+)\.(\w+)\(\)\}([^"]*?)"\s*\)',
-         lambda m: f'format!("{m.group(1)}{{}}{m.group(4)}", {m.group(2)}.{m.group(3)}())'),
-         
-        # Match println!("...{self.field}...")
-        (r'println!\s*\(\s*"([^"]*?)\{self\.(\w+)\}([^"]*?)"\s*\)',
-         lambda m: f'println!("{m.group(1)}{{}}{m.group(3)}", self.{m.group(2)})'),
-         
-        # Match println!("...{var.field}...")
-        (r'println!\s*\(\s*"([^"]*?)\{(\w+)\.(\w+)\}([^"]*?)"\s*\)',
-         lambda m: f'println!("{m.group(1)}{{}}{m.group(4)}", {m.group(2)}.{m.group(3)})'),
-         
-        # Match write!(f, "...{self.field}...")
-        (r'write!\s*\(\s*(\w+)\s*,\s*"([^"]*?)\{self\.(\w+)\}([^"]*?)"\s*\)',
-         lambda m: f'write!({m.group(1)}, "{m.group(2)}{{}}{m.group(4)}", self.{m.group(3)})'),
-         
-        # Match write!(f, "...{var.field}...")
-        (r'write!\s*\(\s*(\w+)\s*,\s*"([^"]*?)\{(\w+)\.(\w+)\}([^"]*?)"\s*\)',
-         lambda m: f'write!({m.group(1)}, "{m.group(2)}{{}}{m.group(5)}", {m.group(3)}.{m.group(4)})'),
-    ]
-    
-    modified = content
-    for pattern, replacement in patterns:
-        modified = re.sub(pattern, replacement, modified)
-    
-    return modified
+    return COMBINED.sub(_replace, content)
+
+# Same pattern over raw bytes, used to rule files out without decoding them.
+# In bytes mode \w and \s only match ASCII, so a miss only proves there is
+# nothing to fix when the file has no non-ASCII bytes either.
+COMBINED_B = re.compile(COMBINED.pattern.encode())
+NON_ASCII_B = re.compile(rb'[\x80-\xff]')
 
 def process_file(file_path):
     """Process a single file."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        with open(file_path, 'rb') as f:
+            # mmap refuses empty files, and they have nothing to fix anyway
+            if os.fstat(f.fileno()).st_size == 0:
+                return False
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if COMBINED_B.search(mm) is None and NON_ASCII_B.search(mm) is None:
+                    return False
+                content = mm[:].decode('utf-8')
         
         modified = fix_format_string_field_access(content)
         
-        if modified != content:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(modified)
+        # sub() hands back the same object when nothing matched
+        if modified is not content:
+            Path(file_path).write_bytes(modified.encode('utf-8'))
             print(f"Fixed: {file_path}")
             return True
         return False
+    except FileNotFoundError:
+        print(f"File not found: {file_path}")
+        return False
     except Exception as e:
         print(f"Error processing {file_path}: {e}")
         return False
 
+# Files with format string errors based on the build output
+DEFAULT_FILES = [
+    "cim-domain-document/src/value_objects/mod.rs",
+    "cim-domain-workflow/src/value_objects/workflow_step.rs",
+    "cim-domain-organization/src/cross_domain/mod.rs",
+    "cim-domain-person/src/projections/person_summary_projection.rs",
+]
+
 def main():
     """Main function."""
-    # Files with format string errors based on the build output
-    files_to_fix = [
-        "cim-domain-document/src/value_objects/mod.rs",
-        "cim-domain-workflow/src/value_objects/workflow_step.rs",
-        "cim-domain-organization/src/cross_domain/mod.rs",
-        "cim-domain-person/src/projections/person_summary_projection.rs",
-    ]
+    # Paths given on the command line take precedence, so the script can be
+    # fanned out with e.g. xargs -P
+    files_to_fix = sys.argv[1:] or DEFAULT_FILES
     
     fixed_count = 0
     for file_path in files_to_fix:
-        if Path(file_path).exists():
-            if process_file(file_path):
-                fixed_count += 1
-        else:
-            print(f"File not found: {file_path}")
+        if process_file(file_path):
+            fixed_count += 1
     
     print(f"\nFixed {fixed_count} files")
 
@@ -3,8 +3,19 @@
 import re
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+_SPLIT = re.compile(r'[(),<>]')
+_PLACEHOLDER = re.compile(r'\{\}')
+
+# format!/println!/eprintln!("...", args) or write!(writer, "...", args)
+MACRO_CALL = re.compile(
+    r'(?:(?P<macro>format|println|eprintln)!\s*\(|(?P<write>write)!\s*\(\s*(?P<writer>[^,]+)\s*,)'
+    r'\s*"(?P<fmt>[^"]*?)"\s*(?P<args>(?:,\s*[^,)]+)+)\s*\)',
+    re.MULTILINE | re.DOTALL
+)
+
 def fix_format_strings(content):
     """Fix format string interpolations in Rust code."""
     
@@ -14,100 +25,54 @@ def fix_format_strings(content):
     )
     
     # Pattern 2: More general - capture all {} placeholders and corresponding variables
-    def replace_format(match):
-        format_str = match.group(1)
-        remaining = match.group(2)
+    def replace_format(match, macro='format!'):
+        format_str = match.group('fmt')
+        remaining = match.group('args')
         
         # Extract all variables from the remaining part
-        vars_part = remaining.strip()
-        if vars_part.startswith(','):
-            vars_part = vars_part[1:].strip()
+        variables = extract_vars(remaining)
         
-        # Split by commas, handling nested parentheses
-        variables = []
-        current_var = ""
-        paren_depth = 0
+        if not variables:
+            return match.group(0)
         
-        for char in vars_part:
-            if char == '(' or char == '<':
-                paren_depth += 1
-            elif char == ')' or char == '>':
-                paren_depth -= 1
-                if paren_depth < 0:
-                    break
-            elif char == ',' and paren_depth == 0:
-                if current_var.strip():
-                    variables.append(current_var.strip())
-                current_var = ""
-                continue
-            current_var += char
+        # Replace each {} with the next variable, cleaning up its name on the
+        # way; subn reports how many placeholders were filled
+        it = iter(variables)
         
-        if current_var.strip() and paren_depth >= 0:
-            variables.append(current_var.strip())
+        def next_var(_):
+            var = next(it).strip()
+            if var.endswith(')') and '(' not in var:
+                var = var[:-1]
+            return '{' + var + '}'
         
-        # Count {} in format string
-        placeholder_count = format_str.count('{}')
+        result, placeholder_count = _PLACEHOLDER.subn(next_var, format_str, count=len(variables))
         
-        if placeholder_count == 0 or len(variables) == 0:
+        if placeholder_count == 0:
             return match.group(0)
         
-        # Replace {} with {var} for each variable
-        result = format_str
-        for i, var in enumerate(variables[:placeholder_count]):
-            # Clean up the variable name
-            var = var.strip()
-            if var.endswith(')') and '(' not in var:
-                var = var[:-1]
-            
-            # Replace the i-th {} with {var}
-            result = result.replace('{}', f'{{{var}}}', 1)
-        
-        # Reconstruct the format! call
+        # Reconstruct the macro call
         remaining_vars = variables[placeholder_count:]
         if remaining_vars:
-            return f'format!("{result}", {", ".join(remaining_vars)})'
+            return f'{macro}("{result}", {", ".join(remaining_vars)})'
         else:
-            return f'format!("{result}")'
-    
-    # Apply the general pattern
-    content = re.sub(
-        r'format!\s*\(\s*"([^"]*?)"\s*((?:,\s*[^,)]+)+)\s*\)',
-        replace_format,
-        content,
-        flags=re.MULTILINE | re.DOTALL
-    )
-    
-    # Also fix println! and eprintln!
-    content = re.sub(
-        r'println!\s*\(\s*"([^"]*?)"\s*((?:,\s*[^,)]+)+)\s*\)',
-        lambda m: replace_format(m).replace('format!', 'println!'),
-        content,
-        flags=re.MULTILINE | re.DOTALL
-    )
-    
-    content = re.sub(
-        r'eprintln!\s*\(\s*"([^"]*?)"\s*((?:,\s*[^,)]+)+)\s*\)',
-        lambda m: replace_format(m).replace('format!', 'eprintln!'),
-        content,
-        flags=re.MULTILINE | re.DOTALL
-    )
+            return f'{macro}("{result}")'
     
-    # Fix write! and writeln! macros too
-    content = re.sub(
-        r'write!\s*\(\s*([^,]+)\s*,\s*"([^"]*?)"\s*((?:,\s*[^,)]+)+)\s*\)',
-        lambda m: f'write!({m.group(1)}, "{fix_placeholders(m.group(2), extract_vars(m.group(3)))}")',
-        content,
-        flags=re.MULTILINE | re.DOTALL
-    )
+    def replace_macro(match):
+        if match.group('write'):
+            variables = extract_vars(match.group('args'))
+            return f'write!({match.group("writer")}, "{fix_placeholders(match.group("fmt"), variables)}")'
+        
+        return replace_format(match, f"{match.group('macro')}!")
     
-    return content
+    # Apply the general pattern to format!, println!, eprintln! and write!
+    # in a single pass
+    return MACRO_CALL.sub(replace_macro, content)
 
 def fix_placeholders(format_str, variables):
     """Replace {} with {var} for each variable."""
-    result = format_str
-    for var in variables:
-        result = result.replace('{}', f'{{{var}}}', 1)
-    return result
+    # Single left-to-right pass; each {} takes the next variable in order
+    it = iter(variables)
+    return _PLACEHOLDER.sub(lambda _: '{' + next(it, '') + '}', format_str, count=len(variables))
 
 def extract_vars(vars_str):
     """Extract variables from a comma-separated string."""
@@ -115,68 +80,93 @@ def extract_vars(vars_str):
     if vars_str.startswith(','):
         vars_str = vars_str[1:].strip()
     
+    # Only brackets and commas affect the split, so jump straight between them
     variables = []
-    current_var = ""
+    start = 0
     paren_depth = 0
     
-    for char in vars_str:
+    for match in _SPLIT.finditer(vars_str):
+        char = match.group()
         if char == '(' or char == '<':
             paren_depth += 1
         elif char == ')' or char == '>':
             paren_depth -= 1
             if paren_depth < 0:
                 break
-        elif char == ',' and paren_depth == 0:
-            if current_var.strip():
-                variables.append(current_var.strip())
-            current_var = ""
-            continue
-        current_var += char
+        elif paren_depth == 0:
+            var = vars_str[start:match.start()].strip()
+            if var:
+                variables.append(var)
+            start = match.end()
     
-    if current_var.strip() and paren_depth >= 0:
-        variables.append(current_var.strip())
+    var = vars_str[start:].strip()
+    if var and paren_depth >= 0:
+        variables.append(var)
     
     return variables
 
+# Files without any of these macros cannot match the patterns above
+# (eprintln! is covered by println!)
+MACRO_TOKENS = (b'format!', b'println!', b'write!')
+
 def process_file(filepath):
     """Process a single Rust file."""
     try:
-        with open(filepath, 'r', encoding='utf-8') as f:
-            content = f.read()
+        raw = Path(filepath).read_bytes()
+        
+        # Cheap substring check before handing the file to the regex engine
+        if not any(token in raw for token in MACRO_TOKENS):
+            return False
+        content = raw.decode('utf-8')
         
-        original = content
         fixed = fix_format_strings(content)
         
-        if fixed != original:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                f.write(fixed)
+        # sub() hands back the same object when nothing matched; a match can
+        # still be rewritten to itself, so fall back to comparing the text
+        if fixed is not content and fixed != content:
+            Path(filepath).write_bytes(fixed.encode('utf-8'))
             return True
         return False
     except Exception as e:
         print(f"Error processing {filepath}: {e}")
         return False
 
+# Directories that are never walked into
+SKIP_DIRS = {'target', 'bevy-patched'}
+
+def iter_rust_files(root):
+    """Yield paths of .rs files under root, pruning SKIP_DIRS."""
+    # Skip directories that can't be read, like os.walk does
+    try:
+        entries = os.scandir(root)
+    except OSError:
+        return
+    
+    with entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if entry.name in SKIP_DIRS:
+                    continue
+                yield from iter_rust_files(entry.path)
+            elif entry.name.endswith('.rs'):
+                yield entry.path
+
 def main():
     """Main function to process all Rust files."""
-    fixed_count = 0
-    total_count = 0
-    
     # Find all Rust files
-    for root, dirs, files in os.walk('.'):
-        # Skip target and bevy-patched directories
-        if 'target' in root or 'bevy-patched' in root:
-            continue
-        
-        for file in files:
-            if file.endswith('.rs'):
-                filepath = os.path.join(root, file)
-                total_count += 1
-                
-                if process_file(filepath):
-                    print(f"Fixed: {filepath}")
-                    fixed_count += 1
+    filepaths = list(iter_rust_files('.'))
+    
+    # Each file is independent, so spread the regex work across all cores
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as executor:
+        results = list(executor.map(process_file, filepaths, chunksize=32))
+    
+    fixed_count = 0
+    for filepath, fixed in zip(filepaths, results):
+        if fixed:
+            print(f"Fixed: {filepath}")
+            fixed_count += 1
     
-    print(f"\nProcessed {total_count} files, fixed {fixed_count} files")
+    print(f"\nProcessed {len(filepaths)} files, fixed {fixed_count} files")
     print("Run 'cargo fmt' to ensure proper formatting")
 
 if __name__ == "__main__":
@@ -8,12 +8,18 @@ import re
 import sys
 from pathlib import Path
 
+# Pattern to match format strings with field access
+# This will match format!("...{expr.field}...") or similar
+FORMAT_PATTERN = re.compile(r'format!\s*\(\s*"([^"]*?)\{([^}]+\.[^}]+)\}([^"]*?)"\s*\)')
+
+# Pattern: format!("...{expr.field}...", other_args)
+FORMAT_ARGS_PATTERN = re.compile(r'format!\s*\(\s*"([^"]*?)\{([^}]+\.[^}]+)\}([^"]*?)"\s*,\s*([^)]+)\)')
+
+# Pattern: write!(writer, "...{expr.field}...")
+WRITE_PATTERN = re.compile(r'write!\s*\(\s*([^,]+),\s*"([^"]*?)\{([^}]+\.[^}]+)\}([^"]*?)"\s*\)')
+
 def fix_format_string_field_access(content):
     """Fix format string field access patterns."""
-    # Pattern to match format strings with field access
-    # This will match format!("...{expr.field}...") or similar
-    pattern = r'format!\s*\(\s*"([^"]*?)\{([^}]+\.[^}]+)\}([^"]*?)"\s*\)'
-    
     def replacer(match):
         prefix = match.group(1)
         field_expr = match.group(2)
@@ -28,12 +34,9 @@ def fix_format_string_field_access(content):
         return new_format
     
     # Apply the fix
-    fixed = re.sub(pattern, replacer, content)
+    fixed = FORMAT_PATTERN.sub(replacer, content)
     
     # Also handle cases with multiple arguments
-    # Pattern: format!("...{expr.field}...", other_args)
-    pattern2 = r'format!\s*\(\s*"([^"]*?)\{([^}]+\.[^}]+)\}([^"]*?)"\s*,\s*([^)]+)\)'
-    
     def replacer2(match):
         prefix = match.group(1)
         field_expr = match.group(2)
@@ -45,11 +48,9 @@ def fix_format_string_field_access(content):
         
         return new_format
     
-    fixed = re.sub(pattern2, replacer2, fixed)
+    fixed = FORMAT_ARGS_PATTERN.sub(replacer2, fixed)
     
     # Handle write! macro as well
-    pattern3 = r'write!\s*\(\s*([^,]+),\s*"([^"]*?)\{([^}]+\.[^}]+)\}([^"]*?)"\s*\)'
-    
     def replacer3(match):
         writer = match.group(1)
         prefix = match.group(2)
@@ -60,21 +61,35 @@ def fix_format_string_field_access(content):
         
         return new_format
     
-    fixed = re.sub(pattern3, replacer3, fixed)
+    fixed = WRITE_PATTERN.sub(replacer3, fixed)
     
     return fixed
 
+# Files without any of these macros cannot match the patterns above
+MACRO_TOKENS = (b'format!', b'write!')
+
+# The same patterns over raw bytes, to rule files out without decoding them.
+# In bytes mode \w and \s only match ASCII, so this is only a safe filter
+# for files that are pure ASCII.
+_COMPILED_B = [re.compile(p.pattern.encode()) for p in (FORMAT_PATTERN, FORMAT_ARGS_PATTERN, WRITE_PATTERN)]
+
 def process_file(file_path):
     """Process a single file."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        raw = Path(file_path).read_bytes()
+        
+        # Cheap checks on the raw bytes; only decode when a pattern may fire
+        if not any(token in raw for token in MACRO_TOKENS):
+            return False
+        if raw.isascii() and not any(pattern.search(raw) for pattern in _COMPILED_B):
+            return False
+        content = raw.decode('utf-8')
         
         fixed_content = fix_format_string_field_access(content)
         
-        if content != fixed_content:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(fixed_content)
+        # sub() hands back the same object when nothing matched
+        if fixed_content is not content:
+            Path(file_path).write_bytes(fixed_content.encode('utf-8'))
             print(f"Fixed: {file_path}")
             return True
         return False
@@ -51,17 +51,27 @@ def fix_format_string_field_access(content):
     
     return modified
 
+# Files without any of these macros cannot match the patterns above
+MACRO_TOKENS = (b'format!', b'println!', b'write!')
+FIELD_ACCESS_HINT = re.compile(r'\{\w+\.')
+
 def process_file(file_path):
     """Process a single file."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        raw = Path(file_path).read_bytes()
+        
+        # Cheap substring checks before handing the file to the regex engine
+        if not any(token in raw for token in MACRO_TOKENS):
+            return False
+        content = raw.decode('utf-8')
+        if FIELD_ACCESS_HINT.search(content) is None:
+            return False
         
         modified = fix_format_string_field_access(content)
         
-        if modified != content:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(modified)
+        # sub() hands back the same object when nothing matched
+        if modified is not content:
+            Path(file_path).write_bytes(modified.encode('utf-8'))
             print(f"Fixed: {file_path}")
             return True
         return False
@@ -7,74 +7,93 @@ import re
 import sys
 from pathlib import Path
 
+# Pattern to match format strings with field access like {self.field} or {var.field}
+# This is more comprehensive than the previous version
+_PATTERNS = [
+    # Match format!("...{self.field}...")
+    (r'format!\s*\(\s*"([^"]*?)\{self\.(\w+)\}([^"]*?)"\s*\)', 
+     lambda m: f'format!("{m.group(1)}{{}}{m.group(3)}", self.{m.group(2)})'),
+    
+    # Match format!("...{variable.field}...")
+    (r'format!\s*\(\s*"([^"]*?)\{(\w+)\.(\w+)\}([^"]*?)"\s*\)',
+     lambda m: f'format!("{m.group(1)}{{}}{m.group(4)}", {m.group(2)}.{m.group(3)})'),
+     
+    # Match println!("...{self.field}...")
+    (r'println!\s*\(\s*"([^"]*?)\{self\.(\w+)\}([^"]*?)"\s*\)',
+     lambda m: f'println!("{m.group(1)}{{}}{m.group(3)}", self.{m.group(2)})'),
+     
+    # Match println!("...{variable.field}...")
+    (r'println!\s*\(\s*"([^"]*?)\{(\w+)\.(\w+)\}([^"]*?)"\s*\)',
+     lambda m: f'println!("{m.group(1)}{{}}{m.group(4)}", {m.group(2)}.{m.group(3)})'),
+     
+    # Match write!(f, "...{self.field}...")
+    (r'write!\s*\(\s*(\w+)\s*,\s*"([^"]*?)\{self\.(\w+)\}([^"]*?)"\s*\)',
+     lambda m: f'write!({m.group(1)}, "{m.group(2)}{{}}{m.group(4)}", self.{m.group(3)})'),
+]
+
+_COMPILED = [(re.compile(p), r) for p, r in _PATTERNS]
+
 def fix_format_string_field_access(content):
     """Fix format string field access patterns."""
-    
-    # Pattern to match format strings with field access like {self.field} or {var.field}
-    # This is more comprehensive than the previous version
-    patterns = [
-        # Match format!("...{self.field}...")
-        (r'format!\s*\(\s*"([^"]*?)\{self\.(\w+)\}([^"]*?)"\s*\)', 
-         lambda m: f'format!("{m.group(1)}{{}}{m.group(3)}", self.{m.group(2)})'),
-        
-        # Match format!("...{variable.field}...")
-        (r'format!\s*\(\s*"([^"]*?)\{(\w+)\.(\w+)\}([^"]*?)"\s*\)',
-         lambda m: f'format!("{m.group(1)}{{}}{m.group(4)}", {m.group(2)}.{m.group(3)})'),
-         
-        # Match println!("...{self.field}...")
-        (r'println!\s*\(\s*"([^"]*?)\{self\.(\w+)\}([^"]*?)"\s*\)',
-         lambda m: f'println!("{m.group(1)}{{}}{m.group(3)}", self.{m.group(2)})'),
-         
-        # Match println!("...{variable.field}...")
-        (r'println!\s*\(\s*"([^"]*?)\{(\w+)\.(\w+)\}([^"]*?)"\s*\)',
-         lambda m: f'println!("{m.group(1)}{{}}{m.group(4)}", {m.group(2)}.{m.group(3)})'),
-         
-        # Match write!(f, "...{self.field}...")
-        (r'write!\s*\(\s*(\w+)\s*,\s*"([^"]*?)\{self\.(\w+)\}([^"]*?)"\s*\)',
-         lambda m: f'write!({m.group(1)}, "{m.group(2)}{{}}{m.group(4)}", self.{m.group(3)})'),
-    ]
-    
     modified = content
-    for pattern, replacement in patterns:
-        modified = re.sub(pattern, replacement, modified)
+    for pattern, replacement in _COMPILED:
+        modified = pattern.sub(replacement, modified)
     
     return modified
 
+# Files without any of these macros cannot match the patterns above
+MACRO_TOKENS = (b'format!', b'println!', b'write!')
+
+# The same patterns over raw bytes, to rule files out without decoding them.
+# In bytes mode \w and \s only match ASCII, so this is only a safe filter
+# for files that are pure ASCII.
+_COMPILED_B = [re.compile(p.encode()) for p, _ in _PATTERNS]
+
 def process_file(file_path):
     """Process a single file."""
     try:
-        with open(file_path, 'r', encoding='utf-8') as f:
-            content = f.read()
+        raw = Path(file_path).read_bytes()
+        
+        # Cheap checks on the raw bytes; only decode when a pattern may fire
+        if not any(token in raw for token in MACRO_TOKENS):
+            return False
+        if raw.isascii() and not any(pattern.search(raw) for pattern in _COMPILED_B):
+            return False
+        content = raw.decode('utf-8')
         
         modified = fix_format_string_field_access(content)
         
-        if modified != content:
-            with open(file_path, 'w', encoding='utf-8') as f:
-                f.write(modified)
+        # sub() hands back the same object when nothing matched
+        if modified is not content:
+            Path(file_path).write_bytes(modified.encode('utf-8'))
             print(f"Fixed: {file_path}")
             return True
         return False
+    except FileNotFoundError:
+        print(f"File not found: {file_path}")
+        return False
     except Exception as e:
         print(f"Error processing {file_path}: {e}")
         return False
 
+# Files with format string errors based on the build output
+DEFAULT_FILES = [
+    "cim-domain-document/src/handlers/event_handler.rs",
+    "cim-domain-organization/src/cross_domain/mod.rs",
+    "cim-domain-workflow/src/state_machine/step_state_machine.rs",
+    "cim-domain-workflow/src/value_objects/workflow_step.rs",
+]
+
 def main():
     """Main function."""
-    # Files with format string errors based on the build output
-    files_to_fix = [
-        "cim-domain-document/src/handlers/event_handler.rs",
-        "cim-domain-organization/src/cross_domain/mod.rs",
-        "cim-domain-workflow/src/state_machine/step_state_machine.rs",
-        "cim-domain-workflow/src/value_objects/workflow_step.rs",
-    ]
+    # Paths given on the command line take precedence, so the script can be
+    # fanned out with e.g. xargs -P
+    files_to_fix = sys.argv[1:] or DEFAULT_FILES
     
     fixed_count = 0
     for file_path in files_to_fix:
-        if Path(file_path).exists():
-            if process_file(file_path):
-                fixed_count += 1
-        else:
-            print(f"File not found: {file_path}")
+        if process_file(file_path):
+            fixed_count += 1
     
     print(f"\nFixed {fixed_count} files")
 
@@ -6,16 +6,26 @@ This script demonstrates how vocabulary.md is a projection of the canonical
 vocabulary data stored in JSON format.
 """
 
+import io
 import json
 import sys
+from collections import defaultdict
 from pathlib import Path
 from typing import Dict, List, Any
 
+# orjson is optional; its decode error subclasses json.JSONDecodeError,
+# so callers can keep catching the stdlib exception either way.
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    _loads = json.loads
+
 
 def load_vocabulary_graph(path: Path) -> Dict[str, Any]:
     """Load the vocabulary graph JSON file."""
-    with open(path, 'r') as f:
-        return json.load(f)
+    with open(path, 'rb') as f:
+        return _loads(f.read())
 
 
 def format_term_name(term: Dict[str, Any]) -> str:
@@ -43,109 +53,85 @@ def format_relationships(relationships: Dict[str, List[str]]) -> str:
 
 def generate_term_section(term: Dict[str, Any], level: str = "####") -> str:
     """Generate markdown for a single term."""
-    lines = [
-        f"{level} Term: {format_term_name(term)}",
-        f"- **Category**: {term.get('type', 'Unknown')}",
-        f"- **Type**: {term.get('type', 'Unknown')}",
-    ]
-
-    if term.get('taxonomy'):
-        lines.append(f"- **Taxonomy**: {term['taxonomy']}")
-
-    lines.extend([
-        f"- **Definition**: {term.get('definition', 'No definition provided')}",
-        "- **Relationships**:",
-        format_relationships(term.get('relationships', {})),
-        f"- **Usage Context**: {term.get('usage_context', 'Not specified')}",
-        f"- **Code Reference**: `{term.get('code_reference', 'TBD')}`" if term.get('code_reference') else "- **Code Reference**: TBD"
-    ])
-
-    return '\n'.join(lines)
+    term_type = term.get('type', 'Unknown')
+    taxonomy = term.get('taxonomy')
+    code_reference = term.get('code_reference')
+
+    taxonomy_line = f"- **Taxonomy**: {taxonomy}\n" if taxonomy else ""
+    code_reference_str = f"`{code_reference}`" if code_reference else "TBD"
+
+    return (
+        f"{level} Term: {format_term_name(term)}\n"
+        f"- **Category**: {term_type}\n"
+        f"- **Type**: {term_type}\n"
+        f"{taxonomy_line}"
+        f"- **Definition**: {term.get('definition', 'No definition provided')}\n"
+        "- **Relationships**:\n"
+        f"{format_relationships(term.get('relationships', {}))}\n"
+        f"- **Usage Context**: {term.get('usage_context', 'Not specified')}\n"
+        f"- **Code Reference**: {code_reference_str}"
+    )
 
 
 def generate_markdown(vocab_data: Dict[str, Any]) -> str:
     """Generate the complete vocabulary.md content."""
-    lines = [
-        "# CIM Vocabulary",
-        "",
-        "[← Back to Index](index.md)",
-        ""
-    ]
-
-    # Group terms by category and subcategory
-    terms_by_category = {}
+    buf = io.StringIO()
+    w = buf.write
+    w("# CIM Vocabulary\n\n[← Back to Index](index.md)\n\n")
+
+    # Group terms by category and subcategory, keyed for direct lookup
+    categories_with_terms = set()
+    direct_terms = defaultdict(list)
+    sub_terms = defaultdict(list)
     for term in vocab_data['terms']:
         cat_id = term['category']
         subcat_id = term.get('subcategory')
-
-        if cat_id not in terms_by_category:
-            terms_by_category[cat_id] = {'subcategories': {}}
+        categories_with_terms.add(cat_id)
 
         if subcat_id:
-            if subcat_id not in terms_by_category[cat_id]['subcategories']:
-                terms_by_category[cat_id]['subcategories'][subcat_id] = []
-            terms_by_category[cat_id]['subcategories'][subcat_id].append(term)
+            sub_terms[cat_id, subcat_id].append(term)
         else:
-            if 'direct' not in terms_by_category[cat_id]:
-                terms_by_category[cat_id]['direct'] = []
-            terms_by_category[cat_id]['direct'].append(term)
+            direct_terms[cat_id].append(term)
 
     # Generate sections based on categories
     for category in vocab_data['categories']:
         cat_id = category['id']
-        if cat_id not in terms_by_category:
+        if cat_id not in categories_with_terms:
             continue
 
-        lines.extend([
-            f"## {category['name']}",
-            ""
-        ])
+        w(f"## {category['name']}\n\n")
 
-        if category.get('description'):
-            lines.extend([
-                f"*{category['description']}*",
-                ""
-            ])
+        description = category.get('description')
+        if description:
+            w(f"*{description}*\n\n")
 
         # Handle subcategories
-        if category.get('subcategories'):
-            for subcat in category['subcategories']:
-                subcat_id = subcat['id']
-                if subcat_id in terms_by_category[cat_id]['subcategories']:
-                    lines.extend([
-                        f"### {subcat['name']}",
-                        ""
-                    ])
-
-                    if subcat.get('description'):
-                        lines.extend([
-                            f"*{subcat['description']}*",
-                            ""
-                        ])
-
-                    # Add terms in this subcategory
-                    for term in terms_by_category[cat_id]['subcategories'][subcat_id]:
-                        lines.extend([
-                            generate_term_section(term),
-                            ""
-                        ])
+        for subcat in category.get('subcategories') or ():
+            terms = sub_terms.get((cat_id, subcat['id']))
+            if not terms:
+                continue
+
+            w(f"### {subcat['name']}\n\n")
+
+            subcat_description = subcat.get('description')
+            if subcat_description:
+                w(f"*{subcat_description}*\n\n")
+
+            # Add terms in this subcategory
+            for term in terms:
+                w(generate_term_section(term))
+                w("\n\n")
 
         # Handle direct terms (no subcategory)
-        if 'direct' in terms_by_category[cat_id]:
-            for term in terms_by_category[cat_id]['direct']:
-                lines.extend([
-                    generate_term_section(term, "###"),
-                    ""
-                ])
+        for term in direct_terms.get(cat_id, ()):
+            w(generate_term_section(term, "###"))
+            w("\n\n")
 
     # Add footer
-    lines.extend([
-        "---",
-        "",
-        "*This vocabulary is continuously updated as the system evolves. For the latest implementation details, refer to the source code and documentation.*"
-    ])
+    w("---\n\n")
+    w("*This vocabulary is continuously updated as the system evolves. For the latest implementation details, refer to the source code and documentation.*")
 
-    return '\n'.join(lines)
+    return buf.getvalue()
 
 
 def main():